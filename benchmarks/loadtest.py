@@ -0,0 +1,401 @@
+"""
+Load test for the Medical Billing MCP server over stdio.
+
+Spawns real server processes (python -m medical_billing_mcp) and replays a mix
+of lookup_* calls from concurrent simulated clients through an MCP ClientSession,
+so MCP framing, call_tool dispatch and JSON encoding are all on the measured path.
+
+Usage:
+    python benchmarks/loadtest.py                          # 8 clients, 8 servers
+    python benchmarks/loadtest.py --clients 32 --requests 200
+    python benchmarks/loadtest.py --clients 32 --servers 1 # 32 clients share 1 session
+    python benchmarks/loadtest.py --json results.json      # Save for comparing releases
+
+By default every client gets its own server process and MCP session (stdio is
+one session per process). With --servers lower than --clients, clients are spread
+round-robin over the servers and the clients on a server multiplex one shared
+session - concurrent in-flight requests on a single stdio pipe, not separate
+sessions. Reports p50/p95/p99 latency, throughput and server RSS over time
+(psutil if installed, otherwise /proc on Linux).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Line the server writes to stderr at shutdown with its coalescing counters
+COALESCE_PREFIX = "medical-billing-mcp coalescing: "
+
+# =============================================================================
+# Request Mix
+# =============================================================================
+
+# (weight, tool, arguments) - roughly what a billing assistant asks for
+REQUEST_MIX: List[Tuple[int, str, Dict[str, Any]]] = [
+    (15, "lookup_icd10", {"code": "E11.9"}),
+    (5, "lookup_icd10", {"code": "I50"}),
+    (10, "lookup_icd10", {"search": "diabetes"}),
+    (5, "lookup_icd10", {"search": "heart failure"}),
+    (12, "lookup_cpt", {"code": "99213"}),
+    (5, "lookup_cpt", {"code": "99214"}),
+    (8, "lookup_cpt", {"search": "office visit"}),
+    (8, "lookup_modifier", {"modifier": "25"}),
+    (4, "lookup_modifier", {"modifier": "59"}),
+    (8, "lookup_denial", {"code": "CO-50"}),
+    (4, "lookup_denial", {"code": "16"}),
+    (5, "lookup_denial", {"search": "medical necessity"}),
+    (6, "lookup_payer", {"payer": "medicare"}),
+    (3, "lookup_payer", {"payer": "bcbs_ma"}),
+    (6, "lookup_bundling", {"codes": ["45378", "45380"]}),
+    (2, "lookup_bundling", {"codes": ["99213", "36415", "93000"]}),
+]
+
+
+def _pick_requests(count: int, rng: random.Random) -> List[Tuple[str, Dict[str, Any]]]:
+    """Draw a weighted sample of (tool, arguments) calls."""
+    weights = [w for w, _, _ in REQUEST_MIX]
+    picks = rng.choices(REQUEST_MIX, weights=weights, k=count)
+    return [(tool, args) for _, tool, args in picks]
+
+
+# =============================================================================
+# RSS Sampling
+# =============================================================================
+
+
+def _server_pids() -> List[int]:
+    """PIDs of server processes spawned by this process."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        pids = []
+        for p in psutil.Process().children(recursive=True):
+            # Children can exit or still be starting while we look at them
+            try:
+                if "medical_billing_mcp" in " ".join(p.cmdline()):
+                    pids.append(p.pid)
+            except psutil.Error:
+                continue
+        return pids
+
+    pids = []
+    me = str(os.getpid())
+    for entry in Path("/proc").glob("[0-9]*"):
+        try:
+            stat = (entry / "stat").read_text()
+            cmdline = (entry / "cmdline").read_bytes()
+        except OSError:
+            continue
+        # stat is "pid (comm) state ppid ..." - comm may contain spaces
+        if stat.rsplit(")", 1)[1].split()[1] == me and b"medical_billing_mcp" in cmdline:
+            pids.append(int(entry.name))
+    return pids
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process in MB, or None if unavailable."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss / 1024 / 1024
+        except psutil.Error:
+            return None
+
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _servers_rss_mb() -> List[float]:
+    """RSS of every running server process, in MB."""
+    return [r for r in (_rss_mb(pid) for pid in _server_pids()) if r is not None]
+
+
+async def _sample_rss(samples: List[Dict], interval: float, start: float, stop: asyncio.Event):
+    """Record total server RSS every `interval` seconds until stopped."""
+    while not stop.is_set():
+        # The process scan runs in a thread so it doesn't stall the event loop
+        # that is timing client requests
+        rss = await asyncio.to_thread(_servers_rss_mb)
+        if rss:
+            elapsed = round(time.perf_counter() - start, 2)
+            samples.append({"t": elapsed, "rss_mb": round(sum(rss), 1)})
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+# =============================================================================
+# Clients
+# =============================================================================
+
+
+async def _run_client(
+    session: ClientSession,
+    calls: List[Tuple[str, Dict[str, Any]]],
+    latencies: List[Tuple[str, float]],
+    errors: List[str],
+):
+    """Send one client's calls back to back, recording latency per call."""
+    for tool, args in calls:
+        began = time.perf_counter()
+        try:
+            result = await session.call_tool(tool, args)
+            if result.isError:
+                errors.append(f"{tool}: {result.content[0].text if result.content else ''}")
+        except Exception as e:
+            errors.append(f"{tool}: {e}")
+            continue
+        latencies.append((tool, time.perf_counter() - began))
+
+
+async def _run_server(
+    client_calls: List[List[Tuple[str, Dict[str, Any]]]],
+    latencies: List[Tuple[str, float]],
+    errors: List[str],
+    coalescing: List[Dict[str, int]],
+    ready: asyncio.Event,
+    go: asyncio.Event,
+):
+    """Spawn one server and drive its clients concurrently over one session."""
+    pythonpath = os.pathsep.join(p for p in [str(SRC_DIR), os.environ.get("PYTHONPATH")] if p)
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=["-m", "medical_billing_mcp"],
+        env={**os.environ, "PYTHONPATH": pythonpath},
+    )
+
+    # Capture stderr to pick up the coalescing counters the server prints on exit
+    with tempfile.TemporaryFile("w+") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                ready.set()
+                await go.wait()
+                await asyncio.gather(
+                    *[_run_client(session, calls, latencies, errors) for calls in client_calls]
+                )
+
+        errlog.seek(0)
+        for line in errlog:
+            if line.startswith(COALESCE_PREFIX):
+                coalescing.append(json.loads(line[len(COALESCE_PREFIX) :]))
+            else:
+                sys.stderr.write(line)
+
+
+# =============================================================================
+# Report
+# =============================================================================
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of latencies in seconds, reported in milliseconds."""
+    if not values:
+        return {}
+    if len(values) == 1:
+        cuts = values * 99
+    else:
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+    }
+
+
+def summarize(
+    latencies: List[Tuple[str, float]],
+    errors: List[str],
+    elapsed: float,
+    rss: List[Dict],
+    coalescing: List[Dict[str, int]],
+) -> Dict[str, Any]:
+    """Build the result summary (also what --json writes)."""
+    by_tool: Dict[str, List[float]] = {}
+    for tool, latency in latencies:
+        by_tool.setdefault(tool, []).append(latency)
+
+    # Summed over servers; None if no server reported its counters
+    coalesce_totals = None
+    if coalescing:
+        coalesce_totals = {
+            key: sum(stats.get(key, 0) for stats in coalescing)
+            for key in ("calls", "inline", "executed", "coalesced")
+        }
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency": _percentiles([latency for _, latency in latencies]),
+        "by_tool": {
+            tool: {"requests": len(values), **_percentiles(values)}
+            for tool, values in sorted(by_tool.items())
+        },
+        "rss": {
+            "peak_mb": max((s["rss_mb"] for s in rss), default=None),
+            "samples": rss,
+        },
+        "coalescing": coalesce_totals,
+    }
+
+
+def print_report(summary: Dict[str, Any], config: Dict[str, Any]):
+    """Print a human-readable report."""
+    latency = summary["latency"]
+    print(
+        f"Medical Billing MCP load test: {config['clients']} clients, "
+        f"{config['servers']} server(s), {config['requests']} requests/client"
+    )
+    if config["servers"] < config["clients"]:
+        print(
+            f"Note: clients multiplex {config['servers']} shared session(s), "
+            "not one session each"
+        )
+    print()
+    print(f"Requests:   {summary['requests']} ({summary['errors']} errors)")
+    print(f"Elapsed:    {summary['elapsed_s']:.2f}s")
+    print(f"Throughput: {summary['throughput_rps']:.1f} req/s")
+    if latency:
+        print(
+            f"Latency:    p50 {latency['p50_ms']:.2f}ms  p95 {latency['p95_ms']:.2f}ms  "
+            f"p99 {latency['p99_ms']:.2f}ms  max {latency['max_ms']:.2f}ms"
+        )
+    print()
+    print(f"{'tool':<18}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for tool, stats in summary["by_tool"].items():
+        print(
+            f"{tool:<18}{stats['requests']:>7}{stats['p50_ms']:>10.2f}"
+            f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+        )
+
+    rss = summary["rss"]
+    print()
+    if rss["samples"]:
+        print(f"Server RSS: peak {rss['peak_mb']:.1f} MB")
+        print("  " + "  ".join(f"{s['t']:.1f}s={s['rss_mb']:.1f}MB" for s in rss["samples"]))
+    else:
+        print("Server RSS: unavailable (install psutil or run on Linux)")
+
+    coalescing = summary["coalescing"]
+    if coalescing:
+        print(
+            f"Coalescing: {coalescing['calls']} calls, {coalescing['inline']} inline, "
+            f"{coalescing['executed']} executed, {coalescing['coalesced']} coalesced"
+        )
+    else:
+        print("Coalescing: not reported by the server")
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+
+async def run(
+    clients: int, servers: int, requests: int, seed: int, rss_interval: float
+) -> Dict[str, Any]:
+    """Run the load test and return the summary."""
+    rng = random.Random(seed)
+    servers = max(1, min(servers, clients))
+    assignments: List[List[List[Tuple[str, Dict[str, Any]]]]] = [[] for _ in range(servers)]
+    for i in range(clients):
+        assignments[i % servers].append(_pick_requests(requests, rng))
+
+    latencies: List[Tuple[str, float]] = []
+    errors: List[str] = []
+    coalescing: List[Dict[str, int]] = []
+    go = asyncio.Event()
+    ready = [asyncio.Event() for _ in range(servers)]
+    tasks = [
+        asyncio.create_task(_run_server(calls, latencies, errors, coalescing, ready[i], go))
+        for i, calls in enumerate(assignments)
+    ]
+
+    # Wait for every server to finish initializing so startup isn't measured
+    all_ready = asyncio.ensure_future(asyncio.gather(*(e.wait() for e in ready)))
+    await asyncio.wait([all_ready, *tasks], return_when=asyncio.FIRST_COMPLETED)
+    if not all_ready.done():
+        all_ready.cancel()
+        go.set()
+        await asyncio.gather(*tasks)  # Re-raises the startup failure
+        raise RuntimeError("Server exited before initializing")
+
+    rss: List[Dict] = []
+    stop = asyncio.Event()
+    start = time.perf_counter()
+    sampler = asyncio.create_task(_sample_rss(rss, rss_interval, start, stop))
+
+    go.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await sampler
+
+    for error in errors[:5]:
+        print(f"error: {error}", file=sys.stderr)
+
+    return summarize(latencies, errors, elapsed, rss, coalescing)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1].strip())
+    parser.add_argument("--clients", type=int, default=8, help="concurrent simulated clients")
+    parser.add_argument(
+        "--servers",
+        type=int,
+        help="server processes/sessions to spawn (default: one per client)",
+    )
+    parser.add_argument("--requests", type=int, default=100, help="requests per client")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the request mix")
+    parser.add_argument("--rss-interval", type=float, default=0.5, help="seconds between samples")
+    parser.add_argument("--json", metavar="FILE", help="also write results as JSON")
+    args = parser.parse_args()
+    servers = max(1, min(args.servers or args.clients, args.clients))
+
+    config = {
+        "clients": args.clients,
+        "servers": servers,
+        "requests": args.requests,
+        "seed": args.seed,
+    }
+    summary = asyncio.run(run(args.clients, servers, args.requests, args.seed, args.rss_interval))
+    print_report(summary, config)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"config": config, **summary}, indent=2))
+
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Hatch build hook: compile src/medical_billing_mcp/data into a data pack
+and ship it in the wheel as medical_billing_mcp/data/datapack.json.
+"""
+
+import importlib.util
+import tempfile
+from pathlib import Path
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+PACKAGE_DIR = Path(__file__).parent / "src" / "medical_billing_mcp"
+
+
+def _load_datapack():
+    """Import datapack.py by path (the package itself may not be importable yet)."""
+    spec = importlib.util.spec_from_file_location("_datapack", PACKAGE_DIR / "datapack.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class DataPackBuildHook(BuildHookInterface):
+    PLUGIN_NAME = "datapack"
+
+    def initialize(self, version, build_data):
+        # Editable installs read data/ from the source tree directly
+        if self.target_name != "wheel" or version == "editable":
+            return
+
+        datapack = _load_datapack()
+        pack = datapack.build_pack(PACKAGE_DIR / "data")
+
+        self._tmp = tempfile.TemporaryDirectory()
+        out = Path(self._tmp.name) / datapack.PACK_FILENAME
+        datapack.write_pack(pack, out)
+
+        build_data["force_include"][str(out)] = f"medical_billing_mcp/data/{datapack.PACK_FILENAME}"
+
+    def finalize(self, version, build_data, artifact_path):
+        if getattr(self, "_tmp", None):
+            self._tmp.cleanup()
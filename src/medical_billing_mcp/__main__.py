@@ -5,6 +5,10 @@ Usage:
     python -m medical_billing_mcp          # Run MCP server
     python -m medical_billing_mcp --test   # Run self-test
     python -m medical_billing_mcp --version
+    python -m medical_billing_mcp --build-pack [--data-dir DIR] [--out FILE] [--pack-version V]
+
+--build-pack writes ./datapack.json unless --out is given; it never writes into
+the installed package.
 """
 
 import sys
@@ -55,6 +59,37 @@ def self_test():
     return 0 if failed == 0 else 1
 
 
+def _option(flag, default=None):
+    """Return the value following a command-line flag, or default."""
+    if flag in sys.argv:
+        i = sys.argv.index(flag)
+        if i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+    return default
+
+
+def build_pack():
+    """Validate the JSON data and compile it into a data pack."""
+    from pathlib import Path
+
+    from . import datapack
+
+    data_dir = Path(_option("--data-dir", Path(__file__).parent / "data"))
+    out = Path(_option("--out", datapack.PACK_FILENAME))
+
+    try:
+        pack = datapack.build_pack(data_dir, version=_option("--pack-version"))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    datapack.write_pack(pack, out)
+    meta = pack["_pack"]
+    print(f"✅ Data pack {meta['version']} ({len(pack['files'])} files) -> {out}")
+    print(f"   {meta['checksum']}")
+    return 0
+
+
 def main():
     """Main entry point."""
     if "--version" in sys.argv:
@@ -64,6 +99,9 @@ def main():
     if "--test" in sys.argv:
         return self_test()
 
+    if "--build-pack" in sys.argv:
+        return build_pack()
+
     # Run the MCP server
     from .server import run
 
@@ -0,0 +1,333 @@
+"""
+Medical Billing MCP - Data Pack
+
+Compiles the JSON files in data/ into a single versioned, checksummed pack
+with precomputed lookup indexes, so the server doesn't rebuild them per process.
+
+    python -m medical_billing_mcp --build-pack --out datapack.json
+
+The pack is also built into the wheel by the hatch build hook (hatch_build.py).
+To swap in a new quarter's data without a release, point the server at a pack:
+
+    MEDICAL_BILLING_DATA_PACK=/path/to/2026Q2.json medical-billing-mcp
+
+Standard library only - the build hook imports this file directly.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PACK_FORMAT = 2
+PACK_FILENAME = "datapack.json"
+PACK_ENV_VAR = "MEDICAL_BILLING_DATA_PACK"
+
+# =============================================================================
+# Schemas
+# =============================================================================
+
+# Per file: collection key -> {field: (expected type(s), required)}
+# Only fields the handlers rely on are listed; extra fields are always allowed.
+SCHEMAS: Dict[str, Dict[str, Dict[str, tuple]]] = {
+    "icd10.json": {
+        "codes": {
+            "description": (str, True),
+            "billable": (bool, False),
+            "chapter": (str, False),
+            "hcc": (bool, False),
+            "hcc_category": (int, False),
+            "common_procedures": (list, False),
+        },
+    },
+    "cpt.json": {
+        "codes": {
+            "description": (str, True),
+            "category": (str, False),
+            "rvu_work": ((int, float), False),
+            "global_period": (int, False),
+            "documentation": (dict, False),
+            "common_modifiers": (list, False),
+            "bundled_with": (list, False),
+        },
+    },
+    "modifiers.json": {
+        "modifiers": {
+            "description": (str, True),
+            "use_with": (list, False),
+            "use_when": ((list, str), False),
+            "documentation_required": (list, False),
+            "common_mistakes": (list, False),
+        },
+    },
+    "denials.json": {
+        "groups": {
+            "name": (str, True),
+            "patient_billable": (bool, False),
+        },
+        "codes": {
+            "description": (str, True),
+            "group": (str, False),
+            "resolution_steps": (list, False),
+            "patient_billable": (bool, False),
+        },
+    },
+    "payers.json": {
+        "payers": {
+            "name": (str, True),
+            "type": (str, False),
+            "timely_filing_days": ((int, str), False),
+            "appeal_deadline_days": (int, False),
+        },
+    },
+    "bundling.json": {
+        "bundles": {
+            "column_1": (str, True),
+            "column_2": (str, True),
+            "modifier_allowed": (bool, False),
+        },
+        "commonly_asked": {
+            "bundled": (bool, True),
+        },
+    },
+}
+
+
+def validate(filename: str, data: Any) -> List[str]:
+    """Check one data file against its schema. Returns a list of problems."""
+    errors = []
+
+    if not isinstance(data, dict):
+        return [f"{filename}: top level must be an object"]
+    if not isinstance(data.get("_meta"), dict):
+        errors.append(f"{filename}: missing '_meta' object")
+
+    for collection, fields in SCHEMAS.get(filename, {}).items():
+        entries = data.get(collection)
+        if not isinstance(entries, dict):
+            errors.append(f"{filename}: missing '{collection}' object")
+            continue
+
+        for key, entry in entries.items():
+            where = f"{filename}: {collection}['{key}']"
+            if not isinstance(entry, dict):
+                errors.append(f"{where} must be an object")
+                continue
+            for field, (types, required) in fields.items():
+                if field not in entry:
+                    if required:
+                        errors.append(f"{where} missing '{field}'")
+                elif not isinstance(entry[field], types):
+                    errors.append(f"{where}.{field} has type {type(entry[field]).__name__}")
+
+    # Cross-checks the handlers depend on
+    if filename == "denials.json":
+        groups = data.get("groups", {})
+        for key, entry in data.get("codes", {}).items():
+            group = entry.get("group") if isinstance(entry, dict) else None
+            if group and group not in groups:
+                errors.append(f"{filename}: codes['{key}'] has unknown group '{group}'")
+
+    if filename == "bundling.json":
+        for key in data.get("bundles", {}):
+            if len(key.split("|")) != 2:
+                errors.append(f"{filename}: bundles key '{key}' must look like 'CODE1|CODE2'")
+
+    return errors
+
+
+# =============================================================================
+# Indexes
+# =============================================================================
+
+# How each file's keys are normalized - mirrors the input cleanup in handlers.py
+NORMALIZERS: Dict[str, Callable[[str], str]] = {
+    "icd10.json": lambda k: k.upper().strip().replace(" ", ""),
+    "cpt.json": lambda k: k.strip(),
+    "modifiers.json": lambda k: k.upper().strip(),
+    "denials.json": lambda k: k.upper().strip(),
+    "payers.json": lambda k: k.lower().strip().replace(" ", "_"),
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Search ranking boosts for ICD-10 codes that can go straight on a claim
+BILLABLE_BOOST = 1.2
+LEAF_BOOST = 1.1
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _search_text(filename: str, entry: Dict) -> str:
+    """Lowercased text a keyword search matches against."""
+    text = entry.get("description", "").lower()
+    if filename == "denials.json":
+        # Denial search also matches resolution steps; \x00 keeps the two apart
+        text += "\x00" + str(entry.get("resolution_steps", [])).lower()
+    return text
+
+
+def build_index(filename: str, data: Dict) -> Dict:
+    """Precompute lookup structures for one data file."""
+    index: Dict[str, Any] = {}
+
+    if filename in ("icd10.json", "cpt.json", "denials.json"):
+        codes = data.get("codes", {})
+        search_text = {k: _search_text(filename, v) for k, v in codes.items()}
+
+        # Postings (token -> {code: term frequency}) and lengths for BM25
+        tokens: Dict[str, Dict[str, int]] = {}
+        doc_len: Dict[str, int] = {}
+        for k, text in search_text.items():
+            words = tokenize(text)
+            doc_len[k] = len(words)
+            for token in words:
+                postings = tokens.setdefault(token, {})
+                postings[k] = postings.get(k, 0) + 1
+
+        sorted_codes = sorted(codes)
+        index["sorted_codes"] = sorted_codes
+        index["search_text"] = search_text
+        index["tokens"] = tokens
+        index["doc_len"] = doc_len
+        index["avg_doc_len"] = sum(doc_len.values()) / len(doc_len) if doc_len else 0.0
+
+        if filename == "icd10.json":
+            # A code is a leaf if no other code extends it (e.g. E11 -> E11.9)
+            boost = {}
+            for i, k in enumerate(sorted_codes):
+                factor = BILLABLE_BOOST if codes[k].get("billable") else 1.0
+                if i + 1 == len(sorted_codes) or not sorted_codes[i + 1].startswith(k):
+                    factor *= LEAF_BOOST
+                if factor != 1.0:
+                    boost[k] = factor
+            index["boost"] = boost
+
+    collection = {"modifiers.json": "modifiers", "payers.json": "payers"}.get(filename, "codes")
+    if filename in NORMALIZERS:
+        normalize = NORMALIZERS[filename]
+        index["keys"] = {normalize(k): k for k in data.get(collection, {})}
+
+    if filename == "bundling.json":
+        # Order-independent pair key -> original bundles key
+        index["pairs"] = {
+            "|".join(sorted(p.strip() for p in k.split("|"))): k for k in data.get("bundles", {})
+        }
+
+    return index
+
+
+# =============================================================================
+# Build / Load
+# =============================================================================
+
+
+def _checksum(pack: Dict) -> str:
+    """SHA-256 over the pack payload (files + indexes), independent of key order."""
+    payload = json.dumps(
+        {"files": pack["files"], "indexes": pack["indexes"]},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return "sha256:" + hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _default_version(files: Dict[str, Dict]) -> str:
+    """Quarter label (e.g. '2026Q1') from the newest '_meta.last_updated'."""
+    dates = [f.get("_meta", {}).get("last_updated", "") for f in files.values()]
+    latest = max((d for d in dates if re.match(r"\d{4}-\d{2}", d)), default="")
+    if not latest:
+        return "unversioned"
+    return f"{latest[:4]}Q{(int(latest[5:7]) - 1) // 3 + 1}"
+
+
+def build_pack(data_dir: Path, version: Optional[str] = None) -> Dict:
+    """
+    Validate every JSON file in data_dir and compile them into a pack.
+
+    Raises:
+        ValueError: if any file is invalid (message lists every problem)
+    """
+    files: Dict[str, Dict] = {}
+    sources: Dict[str, Dict] = {}
+    errors: List[str] = []
+
+    for path in sorted(Path(data_dir).glob("*.json")):
+        if path.name == PACK_FILENAME:
+            continue
+        raw = path.read_bytes()
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError as e:
+            errors.append(f"{path.name}: invalid JSON ({e})")
+            continue
+        errors.extend(validate(path.name, data))
+        files[path.name] = data
+        sources[path.name] = {
+            "sha256": hashlib.sha256(raw).hexdigest(),
+            "version": data.get("_meta", {}).get("version"),
+        }
+
+    errors.extend(
+        f"{name}: file not found" for name in SCHEMAS if not (Path(data_dir) / name).exists()
+    )
+
+    if errors:
+        raise ValueError("Data validation failed:\n  " + "\n  ".join(errors))
+
+    pack = {
+        "_pack": {
+            "format": PACK_FORMAT,
+            "version": version or _default_version(files),
+            "sources": sources,
+        },
+        "files": files,
+        "indexes": {name: build_index(name, data) for name, data in files.items()},
+    }
+    pack["_pack"]["checksum"] = _checksum(pack)
+    return pack
+
+
+def write_pack(pack: Dict, path: Path) -> None:
+    """Write a pack as compact JSON (key order kept so search order is unchanged)."""
+    Path(path).write_text(json.dumps(pack, separators=(",", ":")))
+
+
+def load_pack(path: Path, data_dir: Optional[Path] = None) -> Dict:
+    """
+    Load and verify a pack.
+
+    If data_dir is given, files whose JSON source there no longer matches the
+    pack are dropped so edited data isn't shadowed by a stale pack.
+
+    Raises:
+        ValueError: if the file isn't a pack, the format is unknown or the
+            checksum doesn't match
+    """
+    pack = json.loads(Path(path).read_text())
+    if not isinstance(pack, dict) or not {"_pack", "files", "indexes"} <= pack.keys():
+        raise ValueError(f"Not a data pack: {path}")
+    meta = pack["_pack"]
+
+    if meta.get("format") != PACK_FORMAT:
+        raise ValueError(
+            f"Unsupported data pack format in {path}: {meta.get('format')} "
+            f"(expected {PACK_FORMAT}) - rebuild it with --build-pack"
+        )
+    if meta.get("checksum") != _checksum(pack):
+        raise ValueError(f"Data pack checksum mismatch: {path}")
+
+    if data_dir is not None:
+        for name, source in meta.get("sources", {}).items():
+            source_path = Path(data_dir) / name
+            if not source_path.exists():
+                continue
+            if hashlib.sha256(source_path.read_bytes()).hexdigest() != source["sha256"]:
+                pack["files"].pop(name, None)
+                pack["indexes"].pop(name, None)
+
+    return pack
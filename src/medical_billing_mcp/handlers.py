@@ -7,15 +7,50 @@ Each function loads JSON data and searches/returns results.
 No classes, no complexity - just functions.
 """
 
+import heapq
 import json
+import math
+import os
+from bisect import bisect_left
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import datapack
 
 # =============================================================================
 # Data Loading (with caching)
 # =============================================================================
 
 _cache: Dict[str, Any] = {}
+_index_cache: Dict[str, Dict] = {}
+_packs: Dict[str, Optional[Dict]] = {}
+
+
+def load_pack(data_dir: Path) -> Optional[Dict]:
+    """Load the compiled data pack, if there is one (see datapack.py)."""
+    key = str(data_dir)
+
+    if key not in _packs:
+        override = os.environ.get(datapack.PACK_ENV_VAR)
+        if override:
+            # Explicit pack (e.g. next quarter's data) replaces the shipped JSON,
+            # so a bad one is an error rather than a silent fallback
+            try:
+                _packs[key] = datapack.load_pack(Path(override))
+            except (OSError, ValueError) as e:
+                raise ValueError(f"Cannot load {datapack.PACK_ENV_VAR}={override}: {e}") from e
+        elif (data_dir / datapack.PACK_FILENAME).exists():
+            try:
+                _packs[key] = datapack.load_pack(
+                    data_dir / datapack.PACK_FILENAME, data_dir=data_dir
+                )
+            except (OSError, ValueError):
+                # Corrupt or built by another version - the JSON files still work
+                _packs[key] = None
+        else:
+            _packs[key] = None
+
+    return _packs[key]
 
 
 def _load_data(data_dir: Path, filename: str) -> Dict:
@@ -23,14 +58,104 @@ def _load_data(data_dir: Path, filename: str) -> Dict:
     cache_key = str(data_dir / filename)
 
     if cache_key not in _cache:
-        path = data_dir / filename
-        if not path.exists():
-            return {"codes": {}, "_meta": {"error": f"File not found: {filename}"}}
-        _cache[cache_key] = json.loads(path.read_text())
+        pack = load_pack(data_dir)
+        if pack and filename in pack["files"]:
+            _cache[cache_key] = pack["files"][filename]
+        else:
+            path = data_dir / filename
+            if not path.exists():
+                return {"codes": {}, "_meta": {"error": f"File not found: {filename}"}}
+            _cache[cache_key] = json.loads(path.read_text())
 
     return _cache[cache_key]
 
 
+def _load_index(data_dir: Path, filename: str) -> Dict:
+    """Load precomputed lookup indexes, building them if there's no pack."""
+    cache_key = str(data_dir / filename)
+
+    if cache_key not in _index_cache:
+        pack = load_pack(data_dir)
+        if pack and filename in pack["indexes"]:
+            _index_cache[cache_key] = pack["indexes"][filename]
+        else:
+            data = _load_data(data_dir, filename)
+            index = datapack.build_index(filename, data)
+            if "error" in data.get("_meta", {}):
+                return index  # Not cached, same as _load_data
+            _index_cache[cache_key] = index
+
+    return _index_cache[cache_key]
+
+
+# =============================================================================
+# Search Ranking
+# =============================================================================
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Added to the score when the whole search term appears as-is
+PHRASE_BOOST = 5.0
+
+# Filler words ignored in searches. "with", "without" and "not" are kept - they
+# change clinical meaning ("with complications" vs "without complications")
+STOPWORDS = frozenset("a an and are as at by for from in is of on or the to".split())
+
+
+def _search(index: Dict, search: str, limit: int = 20) -> Tuple[List[str], int]:
+    """
+    Rank codes for a search term.
+
+    A code matches if it contains every search word (stopwords ignored), found by
+    intersecting the token postings. If a word isn't an indexed token (a partial
+    word like "diab"), codes containing the whole search term as typed match
+    instead. A search of only stopwords matches nothing. Matches are ordered by
+    BM25 over their search text plus a bonus for containing the exact phrase,
+    times the code's boost (billable/leaf ICD-10 codes). Only the top `limit` are
+    selected (heap, not a full sort); ties keep data order.
+
+    Returns:
+        (top codes, total number of matching codes)
+    """
+    search_lower = search.lower()
+    terms = [t for t in dict.fromkeys(datapack.tokenize(search_lower)) if t not in STOPWORDS]
+    if not terms:
+        return [], 0
+
+    postings = index["tokens"]
+    search_text = index["search_text"]
+    doc_len = index["doc_len"]
+    avg_len = index["avg_doc_len"] or 1.0
+    n_docs = len(doc_len)
+
+    term_docs = [postings.get(t, {}) for t in terms]
+    if all(term_docs):
+        # Codes containing every term; postings are in data order, so walking the
+        # smallest one keeps ties in data order
+        smallest = min(term_docs, key=len)
+        candidates = [k for k in smallest if all(k in docs for docs in term_docs)]
+    else:
+        # Partial word - only a substring scan can find it
+        candidates = [k for k, text in search_text.items() if search_lower in text]
+
+    idfs = [math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5)) for docs in term_docs]
+    boost = index.get("boost", {})
+    ranked = []
+    for k in candidates:
+        score = PHRASE_BOOST if search_lower in search_text[k] else 0.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[k] / avg_len)
+        for docs, idf in zip(term_docs, idfs):
+            tf = docs.get(k)
+            if tf:
+                score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        ranked.append((k, score * boost.get(k, 1.0)))
+
+    top = heapq.nlargest(limit, ranked, key=lambda item: item[1])
+    return [k for k, _ in top], len(ranked)
+
+
 # =============================================================================
 # ICD-10 Lookup
 # =============================================================================
@@ -50,30 +175,32 @@ def lookup_icd10(data_dir: Path, code: Optional[str] = None, search: Optional[st
     """
     data = _load_data(data_dir, "icd10.json")
     codes = data.get("codes", {})
+    index = _load_index(data_dir, "icd10.json")
 
     if code:
         code = code.upper().strip().replace(" ", "")
-        if code in codes:
-            return {"code": code, **codes[code]}
-
-        # Try partial match
-        matches = [(k, v) for k, v in codes.items() if k.startswith(code)]
+        key = index["keys"].get(code)
+        if key is not None:
+            return {"code": code, **codes[key]}
+
+        # Try partial match (prefix range in the sorted code list)
+        sorted_codes = index["sorted_codes"]
+        matches = []
+        for k in sorted_codes[bisect_left(sorted_codes, code) :]:
+            if not k.startswith(code) or len(matches) == 10:
+                break
+            matches.append(k)
         if matches:
             return {
                 "exact_match": False,
-                "suggestions": [{"code": k, **v} for k, v in matches[:10]],
+                "suggestions": [{"code": k, **codes[k]} for k in matches],
             }
 
         return {"error": f"Code '{code}' not found"}
 
     if search:
-        search_lower = search.lower()
-        matches = [
-            {"code": k, **v}
-            for k, v in codes.items()
-            if search_lower in v.get("description", "").lower()
-        ]
-        return {"results": matches[:20], "total": len(matches)}
+        top, total = _search(index, search)
+        return {"results": [{"code": k, **codes[k]} for k in top], "total": total}
 
     return {"error": "Provide 'code' or 'search' parameter"}
 
@@ -97,21 +224,18 @@ def lookup_cpt(data_dir: Path, code: Optional[str] = None, search: Optional[str]
     """
     data = _load_data(data_dir, "cpt.json")
     codes = data.get("codes", {})
+    index = _load_index(data_dir, "cpt.json")
 
     if code:
         code = code.strip()
-        if code in codes:
-            return {"code": code, **codes[code]}
+        key = index["keys"].get(code)
+        if key is not None:
+            return {"code": code, **codes[key]}
         return {"error": f"Code '{code}' not found"}
 
     if search:
-        search_lower = search.lower()
-        matches = [
-            {"code": k, **v}
-            for k, v in codes.items()
-            if search_lower in v.get("description", "").lower()
-        ]
-        return {"results": matches[:20], "total": len(matches)}
+        top, total = _search(index, search)
+        return {"results": [{"code": k, **codes[k]} for k in top], "total": total}
 
     return {"error": "Provide 'code' or 'search' parameter"}
 
@@ -139,9 +263,10 @@ def lookup_modifier(data_dir: Path, modifier: Optional[str] = None) -> Dict:
         return {"error": "Provide 'modifier' parameter", "available": list(modifiers.keys())}
 
     modifier = modifier.upper().strip()
+    key = _load_index(data_dir, "modifiers.json")["keys"].get(modifier)
 
-    if modifier in modifiers:
-        return {"modifier": modifier, **modifiers[modifier]}
+    if key is not None:
+        return {"modifier": modifier, **modifiers[key]}
 
     return {"error": f"Modifier '{modifier}' not found", "available": list(modifiers.keys())}
 
@@ -166,6 +291,7 @@ def lookup_denial(data_dir: Path, code: Optional[str] = None, search: Optional[s
     data = _load_data(data_dir, "denials.json")
     codes = data.get("codes", {})
     groups = data.get("groups", {})
+    index = _load_index(data_dir, "denials.json")
 
     if code:
         # Parse code - handle "CO-50" or just "50"
@@ -179,8 +305,9 @@ def lookup_denial(data_dir: Path, code: Optional[str] = None, search: Optional[s
             group = parts[0]
             code_num = parts[1]
 
-        if code_num in codes:
-            result = {"code": code_num, **codes[code_num]}
+        key = index["keys"].get(code_num)
+        if key is not None:
+            result = {"code": code_num, **codes[key]}
 
             # Add group info if available
             result_group = result.get("group", group)
@@ -192,14 +319,9 @@ def lookup_denial(data_dir: Path, code: Optional[str] = None, search: Optional[s
         return {"error": f"Denial code '{code}' not found"}
 
     if search:
-        search_lower = search.lower()
-        matches = [
-            {"code": k, **v}
-            for k, v in codes.items()
-            if search_lower in v.get("description", "").lower()
-            or search_lower in str(v.get("resolution_steps", [])).lower()
-        ]
-        return {"results": matches[:20], "total": len(matches)}
+        # search_text covers the description and the resolution steps
+        top, total = _search(index, search)
+        return {"results": [{"code": k, **codes[k]} for k in top], "total": total}
 
     return {"error": "Provide 'code' or 'search' parameter"}
 
@@ -227,9 +349,10 @@ def lookup_payer(data_dir: Path, payer: Optional[str] = None) -> Dict:
         return {"error": "Provide 'payer' parameter", "available": list(payers.keys())}
 
     payer_key = payer.lower().strip().replace(" ", "_")
+    key = _load_index(data_dir, "payers.json")["keys"].get(payer_key)
 
-    if payer_key in payers:
-        return {"payer_id": payer_key, **payers[payer_key]}
+    if key is not None:
+        return {"payer_id": payer_key, **payers[key]}
 
     # Try partial match
     matches = [k for k in payers.keys() if payer_key in k]
@@ -260,6 +383,7 @@ def lookup_bundling(data_dir: Path, codes: List[str] = None) -> Dict:
 
     data = _load_data(data_dir, "bundling.json")
     bundles = data.get("bundles", {})
+    pairs = _load_index(data_dir, "bundling.json")["pairs"]
 
     codes = [c.strip() for c in codes]
     results = []
@@ -267,12 +391,11 @@ def lookup_bundling(data_dir: Path, codes: List[str] = None) -> Dict:
     # Check each pair
     for i, code1 in enumerate(codes):
         for code2 in codes[i + 1 :]:
-            # Create key (sorted for consistent lookup)
+            # Pair index is keyed by the sorted pair, whatever order the data uses
             key = tuple(sorted([code1, code2]))
-            key_str = f"{key[0]}|{key[1]}"
-            alt_key_str = f"{key[1]}|{key[0]}"
+            bundle_key = pairs.get(f"{key[0]}|{key[1]}")
 
-            bundle_info = bundles.get(key_str) or bundles.get(alt_key_str)
+            bundle_info = bundles.get(bundle_key) if bundle_key else None
 
             if bundle_info:
                 results.append({"code_pair": [code1, code2], "bundled": True, **bundle_info})
@@ -9,8 +9,9 @@ License: MIT
 
 import asyncio
 import json
+import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -117,41 +118,113 @@ async def list_tools() -> List[Tool]:
     return TOOLS
 
 
-@server.call_tool()
-async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
-    """Route tool calls to handlers."""
+def _run_tool(name: str, arguments: Dict[str, Any]) -> str:
+    """Route a tool call to its handler and serialize the result."""
 
-    try:
-        # Route to appropriate handler
-        if name == "lookup_icd10":
-            result = handlers.lookup_icd10(
-                DATA_DIR, code=arguments.get("code"), search=arguments.get("search")
-            )
+    # Route to appropriate handler
+    if name == "lookup_icd10":
+        result = handlers.lookup_icd10(
+            DATA_DIR, code=arguments.get("code"), search=arguments.get("search")
+        )
+
+    elif name == "lookup_cpt":
+        result = handlers.lookup_cpt(
+            DATA_DIR, code=arguments.get("code"), search=arguments.get("search")
+        )
+
+    elif name == "lookup_modifier":
+        result = handlers.lookup_modifier(DATA_DIR, modifier=arguments.get("modifier"))
+
+    elif name == "lookup_denial":
+        result = handlers.lookup_denial(
+            DATA_DIR, code=arguments.get("code"), search=arguments.get("search")
+        )
+
+    elif name == "lookup_payer":
+        result = handlers.lookup_payer(DATA_DIR, payer=arguments.get("payer"))
+
+    elif name == "lookup_bundling":
+        result = handlers.lookup_bundling(DATA_DIR, codes=arguments.get("codes", []))
+
+    else:
+        result = {"error": f"Unknown tool: {name}"}
+
+    # Return result as JSON
+    return json.dumps(result, indent=2)
+
+
+# =============================================================================
+# Request Coalescing (single-flight)
+# =============================================================================
+
+# Identical searches and bundling checks that arrive while one is already running
+# share its result instead of each re-running the handler scan and json.dumps.
+# Exact code/modifier/payer lookups are dict hits - cheaper than the thread
+# hand-off - so they run inline.
+_inflight: Dict[str, "asyncio.Task[str]"] = {}
+_coalesce_stats: Dict[str, int] = {"calls": 0, "inline": 0, "executed": 0, "coalesced": 0}
+
+SEARCH_TOOLS = ("lookup_icd10", "lookup_cpt", "lookup_denial")
+
+
+def _coalesce_key(name: str, arguments: Dict[str, Any]) -> Optional[str]:
+    """
+    Key for coalescing an expensive tool call, or None to run it inline.
 
-        elif name == "lookup_cpt":
-            result = handlers.lookup_cpt(
-                DATA_DIR, code=arguments.get("code"), search=arguments.get("search")
-            )
+    Arguments are cleaned up the way the handlers do it, so calls the handlers
+    answer identically (e.g. "Diabetes" and "diabetes") share a key.
+    """
+    if name == "lookup_bundling":
+        codes = arguments.get("codes") or []
+        args: Dict[str, Any] = {"codes": [c.strip() if isinstance(c, str) else c for c in codes]}
+    elif name in SEARCH_TOOLS and not arguments.get("code"):
+        search = arguments.get("search")
+        if not search or not isinstance(search, str):
+            return None
+        # Handlers lowercase the search term and never echo it back
+        args = {"search": search.lower()}
+    else:
+        return None
 
-        elif name == "lookup_modifier":
-            result = handlers.lookup_modifier(DATA_DIR, modifier=arguments.get("modifier"))
+    return json.dumps([name, args], default=str)
 
-        elif name == "lookup_denial":
-            result = handlers.lookup_denial(
-                DATA_DIR, code=arguments.get("code"), search=arguments.get("search")
-            )
 
-        elif name == "lookup_payer":
-            result = handlers.lookup_payer(DATA_DIR, payer=arguments.get("payer"))
+async def _call_coalesced(key: str, name: str, arguments: Dict[str, Any]) -> str:
+    """Run a tool call in a thread, joining an identical in-flight call if there is one."""
+    task = _inflight.get(key)
+    if task is None:
+        _coalesce_stats["executed"] += 1
+        task = asyncio.ensure_future(asyncio.to_thread(_run_tool, name, arguments))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        _coalesce_stats["coalesced"] += 1
 
-        elif name == "lookup_bundling":
-            result = handlers.lookup_bundling(DATA_DIR, codes=arguments.get("codes", []))
+    # Shield so one cancelled caller doesn't cancel the work for everyone else
+    return await asyncio.shield(task)
 
+
+def get_coalesce_stats() -> Dict[str, int]:
+    """Return request coalescing counters (calls, inline, executed, coalesced, in_flight)."""
+    return {**_coalesce_stats, "in_flight": len(_inflight)}
+
+
+@server.call_tool()
+async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
+    """Route tool calls to handlers."""
+
+    try:
+        arguments = arguments or {}
+        _coalesce_stats["calls"] += 1
+
+        key = _coalesce_key(name, arguments)
+        if key is None:
+            _coalesce_stats["inline"] += 1
+            text = _run_tool(name, arguments)
         else:
-            result = {"error": f"Unknown tool: {name}"}
+            text = await _call_coalesced(key, name, arguments)
 
-        # Return result as JSON
-        return CallToolResult(content=[TextContent(type="text", text=json.dumps(result, indent=2))])
+        return CallToolResult(content=[TextContent(type="text", text=text)])
 
     except Exception as e:
         return CallToolResult(
@@ -166,8 +239,19 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
 
 async def main():
     """Run the MCP server."""
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, server.create_initialization_options())
+    # Load the data pack up front so a bad MEDICAL_BILLING_DATA_PACK fails at startup
+    try:
+        handlers.load_pack(DATA_DIR)
+    except ValueError as e:
+        raise SystemExit(f"medical-billing-mcp: {e}")
+
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+    finally:
+        # stdout is the MCP channel, so report counters on stderr (read by the load test)
+        stats = json.dumps(get_coalesce_stats())
+        print(f"medical-billing-mcp coalescing: {stats}", file=sys.stderr)
 
 
 def run():
@@ -0,0 +1,159 @@
+"""
+Tests for the Medical Billing MCP data pack.
+
+Run with: pytest tests/ -v
+"""
+
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from medical_billing_mcp import datapack, handlers
+
+# Data directory
+DATA_DIR = Path(__file__).parent.parent / "src" / "medical_billing_mcp" / "data"
+
+
+@pytest.fixture
+def pack_dir(tmp_path, monkeypatch):
+    """Copy of the data directory with a compiled pack and fresh handler caches."""
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir)
+    datapack.write_pack(datapack.build_pack(data_dir), data_dir / datapack.PACK_FILENAME)
+
+    monkeypatch.delenv(datapack.PACK_ENV_VAR, raising=False)
+    monkeypatch.setattr(handlers, "_cache", {})
+    monkeypatch.setattr(handlers, "_index_cache", {})
+    monkeypatch.setattr(handlers, "_packs", {})
+    return data_dir
+
+
+class TestValidation:
+    """Tests for schema validation."""
+
+    def test_shipped_data_is_valid(self):
+        """Test all shipped data files pass validation."""
+        for path in DATA_DIR.glob("*.json"):
+            assert datapack.validate(path.name, json.loads(path.read_text())) == []
+
+    def test_missing_required_field(self):
+        """Test a code without a description is reported."""
+        data = {"_meta": {}, "codes": {"E11.9": {"billable": True}}}
+        errors = datapack.validate("icd10.json", data)
+        assert any("description" in e for e in errors)
+
+    def test_build_fails_on_invalid_data(self, tmp_path):
+        """Test build_pack raises with every problem listed."""
+        shutil.copytree(DATA_DIR, tmp_path / "data")
+        (tmp_path / "data" / "cpt.json").write_text('{"codes": {"99213": {}}}')
+        with pytest.raises(ValueError, match="cpt.json"):
+            datapack.build_pack(tmp_path / "data")
+
+
+class TestBuild:
+    """Tests for building and loading packs."""
+
+    def test_pack_metadata(self, pack_dir):
+        """Test pack is versioned and checksummed."""
+        pack = datapack.load_pack(pack_dir / datapack.PACK_FILENAME)
+        assert pack["_pack"]["version"] == datapack._default_version(pack["files"])
+        assert datapack.build_pack(pack_dir, version="2026Q2")["_pack"]["version"] == "2026Q2"
+        assert pack["_pack"]["checksum"].startswith("sha256:")
+        assert set(pack["files"]) == set(datapack.SCHEMAS)
+
+    def test_indexes(self):
+        """Test precomputed keys, sorted codes and token index."""
+        data = json.loads((DATA_DIR / "icd10.json").read_text())
+        index = datapack.build_index("icd10.json", data)
+        assert index["sorted_codes"] == sorted(data["codes"])
+        assert index["keys"]["E11.9"] == "E11.9"
+        assert "E11.9" in index["tokens"]["diabetes"]
+
+    def test_bundling_pairs_are_order_independent(self):
+        """Test bundle pairs are keyed by the sorted code pair."""
+        data = {"bundles": {"99213|99000": {}}}
+        assert datapack.build_index("bundling.json", data)["pairs"] == {
+            "99000|99213": "99213|99000"
+        }
+
+    def test_checksum_mismatch(self, pack_dir):
+        """Test a tampered pack is rejected."""
+        path = pack_dir / datapack.PACK_FILENAME
+        path.write_text(path.read_text().replace("Type 2 diabetes", "Type 3 diabetes"))
+        with pytest.raises(ValueError, match="checksum"):
+            datapack.load_pack(path)
+
+    def test_stale_files_dropped(self, pack_dir):
+        """Test files edited after the build are not served from the pack."""
+        icd10 = pack_dir / "icd10.json"
+        icd10.write_text(icd10.read_text().replace("E11.9", "E11.99"))
+        pack = datapack.load_pack(pack_dir / datapack.PACK_FILENAME, data_dir=pack_dir)
+        assert "icd10.json" not in pack["files"]
+        assert "cpt.json" in pack["files"]
+
+
+class TestHandlersWithPack:
+    """Tests that handlers give the same answers from a pack."""
+
+    def test_lookups_match_raw_json(self, pack_dir):
+        """Test pack-backed lookups match the raw JSON lookups."""
+        calls = [
+            (handlers.lookup_icd10, {"code": "E11"}),
+            (handlers.lookup_icd10, {"search": "diabetes"}),
+            (handlers.lookup_cpt, {"code": "99213"}),
+            (handlers.lookup_denial, {"search": "medical necessity"}),
+            (handlers.lookup_payer, {"payer": "Medicare"}),
+            (handlers.lookup_bundling, {"codes": ["45380", "45378"]}),
+        ]
+        with_pack = [func(pack_dir, **kwargs) for func, kwargs in calls]
+        assert handlers._packs[str(pack_dir)] is not None
+
+        (pack_dir / datapack.PACK_FILENAME).unlink()
+        handlers._cache.clear()
+        handlers._index_cache.clear()
+        handlers._packs.clear()
+        without_pack = [func(pack_dir, **kwargs) for func, kwargs in calls]
+
+        assert with_pack == without_pack
+
+    @pytest.mark.parametrize(
+        "contents",
+        [
+            '{"_pack": {"format": 1, "checksum": "x"}, "files": {}, "indexes": {}}',
+            '{"_pack": {"format": 2',
+        ],
+        ids=["old-format", "truncated"],
+    )
+    def test_bad_pack_next_to_data_falls_back(self, pack_dir, contents):
+        """Test a stale or corrupt pack next to the data is ignored, once."""
+        (pack_dir / datapack.PACK_FILENAME).write_text(contents)
+        assert handlers.lookup_cpt(pack_dir, code="99213").get("code") == "99213"
+        assert handlers._packs[str(pack_dir)] is None
+
+    def test_bad_env_var_pack_fails(self, pack_dir, tmp_path, monkeypatch):
+        """Test a bad MEDICAL_BILLING_DATA_PACK is an error naming the variable."""
+        (tmp_path / "bad.json").write_text('{"_pack": {"format": 2')
+        monkeypatch.setenv(datapack.PACK_ENV_VAR, str(tmp_path / "bad.json"))
+        with pytest.raises(ValueError, match=datapack.PACK_ENV_VAR):
+            handlers.lookup_cpt(pack_dir, code="99213")
+
+    def test_env_var_pack(self, pack_dir, tmp_path, monkeypatch):
+        """Test MEDICAL_BILLING_DATA_PACK swaps in another pack."""
+        pack = datapack.build_pack(pack_dir, version="2026Q2")
+        pack["files"]["payers.json"]["payers"]["medicare"]["timely_filing_days"] = 999
+        pack["_pack"]["checksum"] = datapack._checksum(pack)
+        datapack.write_pack(pack, tmp_path / "2026Q2.json")
+
+        monkeypatch.setenv(datapack.PACK_ENV_VAR, str(tmp_path / "2026Q2.json"))
+        result = handlers.lookup_payer(pack_dir, payer="medicare")
+        assert result["timely_filing_days"] == 999
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
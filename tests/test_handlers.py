@@ -147,6 +147,70 @@ class TestBundlingLookup:
         assert "error" in result
 
 
+class TestSearchRanking:
+    """Tests for search relevance ranking."""
+
+    @staticmethod
+    def _index(codes):
+        from medical_billing_mcp import datapack
+
+        return datapack.build_index("icd10.json", {"codes": codes})
+
+    def test_exact_phrase_ranks_first(self):
+        """Test a code containing the whole phrase beats scattered token hits."""
+        index = self._index(
+            {
+                "A1": {"description": "Failure of heart valve graft"},
+                "A2": {"description": "Heart failure, unspecified"},
+            }
+        )
+        top, total = handlers._search(index, "heart failure")
+        assert top == ["A2", "A1"]
+        assert total == 2
+
+    def test_billable_leaf_boosted(self):
+        """Test billable leaf codes outrank their non-billable parent."""
+        index = self._index(
+            {
+                "E11": {"description": "Type 2 diabetes mellitus", "billable": False},
+                "E11.9": {"description": "Type 2 diabetes mellitus", "billable": True},
+            }
+        )
+        top, _ = handlers._search(index, "diabetes")
+        assert top == ["E11.9", "E11"]
+
+    def test_every_word_required(self):
+        """Test 'with' must match - 'without complications' codes are not returned."""
+        result = handlers.lookup_icd10(DATA_DIR, search="diabetes with complications")
+        codes = [r["code"] for r in result["results"]]
+        assert "E11.9" not in codes
+        assert "E10.9" not in codes
+        assert result["total"] == len(codes)
+
+    def test_multiword_match_ignores_filler(self):
+        """Test filler words like 'of' don't pull in codes on their own."""
+        result = handlers.lookup_icd10(DATA_DIR, search="diabetes of")
+        assert result["total"] == handlers.lookup_icd10(DATA_DIR, search="diabetes")["total"]
+
+    def test_stopwords_only(self):
+        """Test a search of only stopwords matches nothing."""
+        result = handlers.lookup_icd10(DATA_DIR, search="of")
+        assert result == {"results": [], "total": 0}
+
+    def test_partial_word_still_matches(self):
+        """Test substring searches keep matching (e.g. 'diab')."""
+        result = handlers.lookup_icd10(DATA_DIR, search="diab")
+        assert result["total"] > 0
+
+    def test_limit_and_total(self):
+        """Test only the top results are returned but total counts all matches."""
+        index = self._index({f"C{i:02d}": {"description": "cough"} for i in range(30)})
+        top, total = handlers._search(index, "cough", limit=20)
+        assert len(top) == 20
+        assert total == 30
+        assert top[0] == "C00"  # Ties keep data order
+
+
 class TestDataLoading:
     """Tests for data file loading."""
 
@@ -0,0 +1,116 @@
+"""
+Tests for Medical Billing MCP server routing.
+
+Run with: pytest tests/ -v
+"""
+
+import asyncio
+import importlib
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# The package re-exports the Server instance as `server`, so import the module by name
+server_module = importlib.import_module("medical_billing_mcp.server")
+
+
+class TestCallTool:
+    """Tests for tool call routing."""
+
+    async def test_call_tool_returns_json(self):
+        """Test a tool call returns the handler result as JSON text."""
+        result = await server_module.call_tool("lookup_icd10", {"code": "E11.9"})
+        payload = json.loads(result.content[0].text)
+        assert payload.get("code") == "E11.9"
+
+    async def test_unknown_tool(self):
+        """Test unknown tool returns error."""
+        result = await server_module.call_tool("lookup_nothing", {})
+        assert "error" in json.loads(result.content[0].text)
+
+
+class TestCoalescing:
+    """Tests for single-flight coalescing of identical tool calls."""
+
+    def test_key_normalizes_like_handlers(self):
+        """Test calls the handlers answer identically share a key."""
+        key = server_module._coalesce_key
+        assert key("lookup_icd10", {"search": "Diabetes", "code": None}) == key(
+            "lookup_icd10", {"search": "diabetes"}
+        )
+        assert key("lookup_bundling", {"codes": [" 45378", "45380 "]}) == key(
+            "lookup_bundling", {"codes": ["45378", "45380"]}
+        )
+        assert key("lookup_cpt", {"search": "visit"}) != key("lookup_icd10", {"search": "visit"})
+
+    def test_exact_lookups_run_inline(self):
+        """Test cheap exact lookups are not coalesced."""
+        key = server_module._coalesce_key
+        assert key("lookup_icd10", {"code": "E11.9"}) is None
+        assert key("lookup_icd10", {"code": "E11.9", "search": "diabetes"}) is None
+        assert key("lookup_payer", {"payer": "medicare"}) is None
+        assert key("lookup_modifier", {"modifier": "25"}) is None
+
+    async def test_exact_lookup_counted_inline(self):
+        """Test an exact lookup is answered inline without a thread hand-off."""
+        before = server_module.get_coalesce_stats()
+        await server_module.call_tool("lookup_cpt", {"code": "99213"})
+        after = server_module.get_coalesce_stats()
+        assert after["inline"] - before["inline"] == 1
+        assert after["executed"] == before["executed"]
+
+    async def test_concurrent_duplicates_share_one_run(self, monkeypatch):
+        """Test identical concurrent calls run the handler once."""
+        runs = []
+
+        def slow_run_tool(name, arguments):
+            runs.append(name)
+            time.sleep(0.05)
+            return json.dumps({"ok": True})
+
+        monkeypatch.setattr(server_module, "_run_tool", slow_run_tool)
+        before = server_module.get_coalesce_stats()
+
+        results = await asyncio.gather(
+            *[
+                server_module.call_tool("lookup_icd10", {"search": s})
+                for s in ["diabetes", "Diabetes", "DIABETES", "diabetes", "diabetes"]
+            ]
+        )
+
+        after = server_module.get_coalesce_stats()
+        assert len(runs) == 1
+        assert all(r.content[0].text == results[0].content[0].text for r in results)
+        assert after["executed"] - before["executed"] == 1
+        assert after["coalesced"] - before["coalesced"] == 4
+        assert after["in_flight"] == 0
+
+    async def test_errors_shared_and_not_cached(self, monkeypatch):
+        """Test concurrent callers share one failure and a later call runs again."""
+        runs = []
+
+        def failing_run_tool(name, arguments):
+            runs.append(name)
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        monkeypatch.setattr(server_module, "_run_tool", failing_run_tool)
+
+        results = await asyncio.gather(
+            *[server_module.call_tool("lookup_bundling", {"codes": ["1", "2"]}) for _ in range(3)]
+        )
+        assert len(runs) == 1
+        assert all(json.loads(r.content[0].text) == {"error": "boom"} for r in results)
+
+        await server_module.call_tool("lookup_bundling", {"codes": ["1", "2"]})
+        assert len(runs) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])